@@ -7,4 +7,48 @@ OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 if not OPENAI_API_KEY:
     raise EnvironmentError("OPENAI_API_KEY not set in environment variables.")
 
-OPENAI_MODEL_NAME = os.getenv("OPENAI_MODEL_NAME", "gpt-3.5-turbo-1106")
\ No newline at end of file
+OPENAI_MODEL_NAME = os.getenv("OPENAI_MODEL_NAME", "gpt-3.5-turbo-1106")
+
+# Per-stage model routing. OPENAI_MODEL_<STAGE> is a comma-separated cascade,
+# e.g. OPENAI_MODEL_SUMMARIZE_CHUNK="gpt-4o-mini,gpt-4o": the first model is tried,
+# later ones only when the output fails the stage's format check.
+SUMMARIZER_STAGES = (
+    "summarize_chunk",
+    "meta_summarize",
+    "executive_summary",
+    "chat_on_summary",
+    "generate_slide_bullets",
+    "chat_on_slide_bullets",
+    "ask_thrust",
+)
+
+def _stage_models(stage: str) -> list[str]:
+    raw = os.getenv(f"OPENAI_MODEL_{stage.upper()}", "")
+    models = [m.strip() for m in raw.split(",") if m.strip()]
+    return models or [OPENAI_MODEL_NAME]
+
+OPENAI_STAGE_MODELS = {stage: _stage_models(stage) for stage in SUMMARIZER_STAGES}
+
+# Stored precision for embeddings: "float32", "float16" or "int8"
+EMBEDDING_QUANTIZATION = os.getenv("EMBEDDING_QUANTIZATION", "float32")
+EMBEDDING_CACHE_SIZE = int(os.getenv("EMBEDDING_CACHE_SIZE", "512"))
+
+# Semantic answer cache for /ask_thrust/: cosine threshold, entries per project, TTL in seconds (0 = none)
+ASK_THRUST_CACHE_THRESHOLD = float(os.getenv("ASK_THRUST_CACHE_THRESHOLD", "0.95"))
+ASK_THRUST_CACHE_SIZE = int(os.getenv("ASK_THRUST_CACHE_SIZE", "256"))
+# Hits are checked against the briefs they cite; the TTL bounds staleness from briefs added by other workers
+ASK_THRUST_CACHE_TTL = float(os.getenv("ASK_THRUST_CACHE_TTL", "3600"))
+
+# Batch summarize: concurrent LLM calls shared by every document in flight, and PDF parser processes
+BATCH_LLM_WORKERS = int(os.getenv("BATCH_LLM_WORKERS", "8"))
+BATCH_PARSE_WORKERS = int(os.getenv("BATCH_PARSE_WORKERS", str(os.cpu_count() or 2)))
+
+# Coarse-to-fine /ask_thrust_global/: route to the closest projects by centroid, then search inside each
+ASK_THRUST_GLOBAL_ROUTED = os.getenv("ASK_THRUST_GLOBAL_ROUTED", "false").lower() == "true"
+ASK_THRUST_GLOBAL_TOP_PROJECTS = int(os.getenv("ASK_THRUST_GLOBAL_TOP_PROJECTS", "3"))
+ASK_THRUST_GLOBAL_PER_PROJECT = int(os.getenv("ASK_THRUST_GLOBAL_PER_PROJECT", "3"))
+# Seconds before a user's project centroids are re-synced with Supabase (deletes, other workers' inserts)
+ASK_THRUST_GLOBAL_INDEX_TTL = float(os.getenv("ASK_THRUST_GLOBAL_INDEX_TTL", "300"))
+
+# Concurrent chunk summaries per /summarize/stream/ request
+SUMMARIZE_STREAM_WORKERS = int(os.getenv("SUMMARIZE_STREAM_WORKERS", "4"))
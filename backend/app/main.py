@@ -1,6 +1,6 @@
 # main.py
 from fastapi import FastAPI
-from app.routes import summarize, upload, chat, brief, slide_bullets, ask_thrust, ask_thrust_global, thrust_chats
+from app.routes import summarize, summarize_batch, upload, chat, brief, slide_bullets, ask_thrust, ask_thrust_global, thrust_chats, llm_routing
 from fastapi.middleware.cors import CORSMiddleware
 from app.models import Base
 from app.db import engine
@@ -16,12 +16,14 @@ def root():
 
 app.include_router(upload.router, prefix="/api")
 app.include_router(summarize.router, prefix="/api")
+app.include_router(summarize_batch.router, prefix="/api")
 app.include_router(chat.router, prefix="/api")
 app.include_router(brief.router, prefix="/api")
 app.include_router(slide_bullets.router, prefix="/api")
 app.include_router(ask_thrust.router, prefix="/api")
 app.include_router(ask_thrust_global.router, prefix="/api")
 app.include_router(thrust_chats.router, prefix="/api")
+app.include_router(llm_routing.router, prefix="/api")
 
 app.add_middleware(
     CORSMiddleware,
@@ -29,5 +31,6 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "X-Next-Cursor"],
 )
 print("FASTAPI SERVER STARTING")
@@ -1,13 +1,17 @@
 # app/routes/ask_thrust.py
 
 from fastapi import APIRouter, Body
+from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel
 from typing import List, Dict, Any
 from app.services.llm import Summarizer
 from app.utils.embed import get_embedding  # <-- your embedding utility
+from app.services.answer_cache import answer_cache
 from supabase import create_client
 import os
 import re
+import time
+import hashlib
 
 router = APIRouter()
 
@@ -20,18 +24,58 @@ class AskThrustRequest(BaseModel):
     message: str
     history: List[Dict[str, Any]] = []
 
+# The brief fields an answer is built from; a change to any of them makes a cached answer stale
+_BRIEF_CONTENT_FIELDS = ("title", "summary", "executive_summary", "slide_bullets")
+
+def brief_version(brief: dict) -> str:
+    content = "\x00".join(str(brief.get(f) or "") for f in _BRIEF_CONTENT_FIELDS)
+    return hashlib.sha1(content.encode("utf-8")).hexdigest()
+
+def current_brief_versions(brief_ids: list) -> dict:
+    """
+    {brief_id: fingerprint} read straight from the briefs table. Both storing and checking
+    a cached answer go through this, so the fingerprints always come from the same projection.
+    """
+    if not brief_ids:
+        return {}
+    resp = (
+        supabase.table("briefs")
+        .select("id," + ",".join(_BRIEF_CONTENT_FIELDS))
+        .in_("id", [str(b) for b in brief_ids])
+        .execute()
+    )
+    rows = resp.data if hasattr(resp, "data") else resp.get("data", [])
+    return {str(row["id"]): brief_version(row) for row in rows}
+
+def briefs_unchanged(brief_versions: dict) -> bool:
+    """
+    True if every brief behind a cached answer still exists with the same content. The
+    frontend edits and deletes briefs directly in Supabase, so the backend never hears of it.
+    """
+    return current_brief_versions(list(brief_versions)) == brief_versions
+
 @router.post("/ask_thrust/")
 async def ask_thrust(request: AskThrustRequest):
     # 1. Get query embedding
     try:
-        query_embedding = get_embedding(request.message)
+        # Queries stay float32 whatever EMBEDDING_QUANTIZATION is; only stored briefs are quantized
+        query_embedding = get_embedding(request.message, mode="float32")
     except Exception as e:
         return {"response": f"Embedding error: {str(e)}", "citations": []}
 
+    # Answers that depend on chat history aren't reusable across users, so only cache fresh questions
+    use_cache = not request.history
+    if use_cache:
+        # The freshness check is a Supabase round trip; keep it off the event loop
+        cached = await run_in_threadpool(answer_cache.lookup, request.project_id, query_embedding, is_current=briefs_unchanged)
+        if cached is not None:
+            return {**cached, "cached": True}
+    started = time.perf_counter()
+
     # 2. Vector search: retrieve top 5 most relevant briefs for project
-    # Note: 'embedding' must be passed as a list of floats for Supabase RPC
+    # Note: pgvector accepts the "[x,y,...]" text literal, which is far smaller than a JSON float list
     rpc_args = {
-        "query_embedding": query_embedding,
+        "query_embedding": query_embedding.to_pgvector(),
         "project_id": request.project_id,
         "top_n": 5,
     }
@@ -78,7 +122,18 @@ async def ask_thrust(request: AskThrustRequest):
         else:
             citations.append({"label": label, "brief_id": None})
 
-    return {
+    result = {
         "response": llm_response,
         "citations": citations,
     }
+    if use_cache:
+        # Fingerprint from the table, not the RPC rows, which may not carry every content column
+        brief_ids = [brief["id"] for brief in briefs if brief.get("id") is not None]
+        brief_versions = await run_in_threadpool(current_brief_versions, brief_ids)
+        answer_cache.store(request.project_id, query_embedding, brief_versions, result, time.perf_counter() - started)
+    return result
+
+
+@router.get("/ask_thrust/cache_stats/")
+def ask_thrust_cache_stats():
+    return answer_cache.stats()
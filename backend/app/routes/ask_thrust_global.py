@@ -1,8 +1,12 @@
 from fastapi import APIRouter
+from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel
 from typing import List, Dict, Any
 from app.services.llm import Summarizer
 from app.utils.embed import get_embedding
+from app.services.project_index import project_index
+from app.config import ASK_THRUST_GLOBAL_ROUTED, ASK_THRUST_GLOBAL_TOP_PROJECTS, ASK_THRUST_GLOBAL_PER_PROJECT
+from concurrent.futures import ThreadPoolExecutor
 from supabase import create_client
 import os
 import re
@@ -17,21 +21,63 @@ class GlobalAskThrustRequest(BaseModel):
     user_id: str
     message: str
     history: List[Dict[str, Any]] = []
+    # Coarse-to-fine search: pick the closest projects first, then briefs inside them
+    routed: bool = ASK_THRUST_GLOBAL_ROUTED
+
+TOP_N = 7
+
+
+def routed_match(user_id: str, query_embedding) -> list[dict]:
+    """
+    Two-stage retrieval. Rank the user's projects by centroid similarity, then run the
+    per-project RPC on the top ones (at most ASK_THRUST_GLOBAL_PER_PROJECT briefs each)
+    and interleave the results by project rank, so no single large project dominates.
+    """
+    projects = project_index.top_projects(supabase, user_id, query_embedding, ASK_THRUST_GLOBAL_TOP_PROJECTS)
+    if not projects:
+        return []
+
+    def search(project_id):
+        rpc_args = {
+            "query_embedding": query_embedding.to_pgvector(),
+            "project_id": project_id,
+            "top_n": ASK_THRUST_GLOBAL_PER_PROJECT,
+        }
+        resp = supabase.rpc("match_briefs_by_embedding", rpc_args).execute()
+        return resp.data if hasattr(resp, "data") else resp.get("data", [])
+
+    with ThreadPoolExecutor(max_workers=len(projects)) as pool:
+        per_project = list(pool.map(search, [p[0] for p in projects]))
+
+    for (project_id, project_title, _), briefs in zip(projects, per_project):
+        for brief in briefs:
+            brief.setdefault("project_id", project_id)
+            brief.setdefault("project_title", project_title)
+
+    merged = []
+    for rank in range(ASK_THRUST_GLOBAL_PER_PROJECT):
+        merged.extend(briefs[rank] for briefs in per_project if rank < len(briefs))
+    return merged[:TOP_N]
 
 @router.post("/ask_thrust_global/")
 async def ask_thrust_global(request: GlobalAskThrustRequest):
     try:
-        query_embedding = get_embedding(request.message)
+        # Queries stay float32 whatever EMBEDDING_QUANTIZATION is; only stored briefs are quantized
+        query_embedding = get_embedding(request.message, mode="float32")
     except Exception as e:
         return {"response": f"Embedding error: {str(e)}", "citations": []}
 
-    rpc_args = {
-        "query_embedding": query_embedding,
-        "target_user_id": request.user_id,
-        "top_n": 7,
-    }
-    match_resp = supabase.rpc("match_briefs_by_user_embedding", rpc_args).execute()
-    briefs = match_resp.data if hasattr(match_resp, "data") else match_resp.get("data", [])
+    if request.routed:
+        # Index sync and the per-project RPC fan-out are blocking; keep them off the event loop
+        briefs = await run_in_threadpool(routed_match, request.user_id, query_embedding)
+    else:
+        rpc_args = {
+            "query_embedding": query_embedding.to_pgvector(),
+            "target_user_id": request.user_id,
+            "top_n": TOP_N,
+        }
+        match_resp = supabase.rpc("match_briefs_by_user_embedding", rpc_args).execute()
+        briefs = match_resp.data if hasattr(match_resp, "data") else match_resp.get("data", [])
 
     if not briefs:
         return {"response": "No relevant briefs found in your account.", "citations": []}
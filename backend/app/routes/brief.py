@@ -2,6 +2,8 @@ from fastapi import APIRouter, Path, Body, Query
 from app.models import Brief
 from app.db import SessionLocal
 from app.utils.embed import get_embedding
+from app.services.answer_cache import answer_cache
+from app.services.project_index import project_index
 import os
 from supabase import create_client
 
@@ -62,6 +64,8 @@ def update_brief(id: int = Path(...), payload: dict = Body(...)):
         b = brief_resp.data if hasattr(brief_resp, "data") else brief_resp.get("data", {})
         embedding_text = (b.get("summary") or "") + "\n" + (b.get("executive_summary") or "") + "\n" + (b.get("slide_bullets") or "")
         embedding = get_embedding(embedding_text)
-        supabase.table("briefs").update({"embedding": embedding}).eq("id", id).execute()
+        supabase.table("briefs").update({"embedding": embedding.to_pgvector()}).eq("id", id).execute()
+        answer_cache.invalidate_brief(id)
+        project_index.update_brief(id, embedding)
     db.close()
     return {"success": updated}
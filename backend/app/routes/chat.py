@@ -1,6 +1,8 @@
 from fastapi import APIRouter, Body
 from app.utils.embed import get_embedding
 from app.services.llm import Summarizer
+from app.services.answer_cache import answer_cache
+from app.services.project_index import project_index
 from app.models import Brief
 from app.db import SessionLocal
 import logging, os
@@ -53,7 +55,9 @@ def chat_with_ai(payload: dict = Body(...)):
             brief = brief_resp.data if hasattr(brief_resp, "data") else brief_resp.get("data", {})
             embedding_text = (response or "") + "\n" + (brief.get("executive_summary") or "") + "\n" + (brief.get("slide_bullets") or "")
             embedding = get_embedding(embedding_text)
-            supabase.table("briefs").update({"embedding": embedding, "summary": response}).eq("id", summary_id).execute()
+            supabase.table("briefs").update({"embedding": embedding.to_pgvector(), "summary": response}).eq("id", summary_id).execute()
+            answer_cache.invalidate_brief(summary_id)
+            project_index.update_brief(summary_id, embedding)
             # ===
 
         return {"message": response}
@@ -0,0 +1,10 @@
+# app/routes/llm_routing.py
+
+from fastapi import APIRouter
+from app.services.llm import routing_stats
+
+router = APIRouter()
+
+@router.get("/llm_routing_stats/")
+def llm_routing_stats():
+    return routing_stats.snapshot()
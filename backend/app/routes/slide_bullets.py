@@ -3,6 +3,8 @@
 from fastapi import APIRouter, Body
 from app.utils.embed import get_embedding
 from app.services.llm import Summarizer
+from app.services.answer_cache import answer_cache
+from app.services.project_index import project_index
 import os
 import logging
 from supabase import create_client
@@ -41,7 +43,9 @@ def generate_slide_bullets(payload: dict = Body(...)):
     brief = brief_resp.data if hasattr(brief_resp, "data") else brief_resp.get("data", {})
     embedding_text = (brief.get("summary") or "") + "\n" + (brief.get("executive_summary") or "") + "\n" + (bullets or "")
     embedding = get_embedding(embedding_text)
-    supabase.table("briefs").update({"embedding": embedding}).eq("id", brief_id).execute()
+    supabase.table("briefs").update({"embedding": embedding.to_pgvector()}).eq("id", brief_id).execute()
+    answer_cache.invalidate_brief(brief_id)
+    project_index.update_brief(brief_id, embedding)
     # ===
 
     return {"bullets_markdown": bullets}
@@ -1,14 +1,20 @@
 # app/routes/summarize.py
 
 from fastapi import APIRouter, Body
-from app.services.parser import extract_text_from_pdf
-from app.utils.chunker import chunk_text
+from fastapi.responses import StreamingResponse
+from app.services.parser import extract_pages_from_pdf_bytes
+from app.utils.chunker import chunk_pages
 from app.utils.embed import get_embedding
 from app.services.llm import Summarizer
+from app.services.answer_cache import answer_cache
+from app.services.project_index import project_index
+from app.config import SUMMARIZE_STREAM_WORKERS
 import os
+import json
+import asyncio
 import logging
 import requests
-import tempfile
+from concurrent.futures import ThreadPoolExecutor
 from supabase import create_client
 
 logging.basicConfig(
@@ -23,6 +29,73 @@ supabase = create_client(SUPABASE_URL, SUPABASE_SERVICE_KEY)
 
 router = APIRouter()
 
+
+def reduce_summaries(summarizer: Summarizer, chunk_summaries: list[str], user_prompt: str, submit=None):
+    """
+    Reduce stage: up to 5 chunk summaries are joined as-is, more get a meta-summary.
+    Returns (summary, exec_source). `submit(fn, *args, **kwargs) -> Future` runs the LLM
+    call somewhere other than the calling thread.
+    """
+    if len(chunk_summaries) <= 5:
+        return "\n\n".join(chunk_summaries), chunk_summaries
+    if submit is None:
+        summary = summarizer.meta_summarize(chunk_summaries, user_instruction=user_prompt)
+    else:
+        summary = submit(summarizer.meta_summarize, chunk_summaries, user_instruction=user_prompt).result()
+    return summary, summary
+
+def finish_brief(summarizer: Summarizer, summary: str, exec_source, user_prompt: str, with_slide_bullets: bool, submit=None):
+    """
+    Executive summary and (optionally) default slide bullets only depend on the reduced
+    summary, so run them side by side. Returns (exec_summary, slide_bullets or None).
+    """
+    if submit is None and not with_slide_bullets:
+        return summarizer.executive_summary(exec_source, user_instruction=user_prompt), None
+    pool = None
+    if submit is None:
+        pool = ThreadPoolExecutor(max_workers=2)
+        submit = pool.submit
+    try:
+        exec_future = submit(summarizer.executive_summary, exec_source, user_instruction=user_prompt)
+        bullets_future = submit(summarizer.generate_slide_bullets, summary) if with_slide_bullets else None
+        exec_summary = exec_future.result()
+        slide_bullets = bullets_future.result() if bullets_future else None
+    finally:
+        if pool is not None:
+            pool.shutdown()
+    if slide_bullets is not None:
+        logger.info(f"Generated Slide Bullets:\n{slide_bullets}\n")
+    return exec_summary, slide_bullets
+
+def save_brief(project_id, user_id, title: str, summary: str, exec_summary: str, slide_bullets: str = None):
+    """Embed the finished brief and insert it into Supabase. Returns the inserted row(s)."""
+    # === NEW: Generate embedding for brief ===
+    embedding_text = summary + "\n" + exec_summary
+    if slide_bullets:
+        embedding_text += "\n" + slide_bullets
+    embedding = get_embedding(embedding_text)
+    # ===
+
+    # --- Save to Supabase briefs table ---
+    brief_data = {
+        "project_id": project_id,
+        "user_id": user_id,
+        "title": title,
+        "summary": summary,
+        "executive_summary": exec_summary,
+        "embedding": embedding.to_pgvector(),
+        "status": "done",
+    }
+    if slide_bullets is not None:
+        brief_data["slide_bullets"] = slide_bullets
+
+    result = supabase.table("briefs").insert(brief_data).execute()
+    logger.info(f"Inserted brief into Supabase: {result.data}")
+    answer_cache.invalidate_project(project_id)
+    for row in result.data or []:
+        project_index.record_brief(supabase, row["id"], project_id, user_id, embedding)
+    return result.data
+
 @router.post("/summarize/")
 def summarize(payload: dict = Body(...)):
     logger.info("=== /api/summarize/ endpoint HIT ===")
@@ -32,6 +105,8 @@ def summarize(payload: dict = Body(...)):
     user_prompt = payload.get("prompt", "")
     project_id = payload.get("project_id")
     user_id = payload.get("user_id")
+    # Generate default slide bullets alongside the executive summary, saving the later round trip
+    with_slide_bullets = bool(payload.get("generate_slide_bullets", False))
 
     if not project_id or not user_id:
         logger.error("Missing user_id or project_id in payload")
@@ -40,7 +115,9 @@ def summarize(payload: dict = Body(...)):
     summarizer = Summarizer()
     summary = ""
     exec_summary = ""
+    slide_bullets = None
     chunks_used = 0
+    duplicates_skipped = 0
     time_estimate = None
     filename = None
 
@@ -50,18 +127,12 @@ def summarize(payload: dict = Body(...)):
         if resp.status_code != 200:
             logger.error(f"Could not fetch PDF from storage: {file_url}")
             return {"error": "Could not fetch file from storage."}
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as tmp:
-            tmp.write(resp.content)
-            temp_path = tmp.name
-        try:
-            text = extract_text_from_pdf(temp_path)
-        finally:
-            os.remove(temp_path)
+        pages = extract_pages_from_pdf_bytes(resp.content)
         filename = file_url.split("/")[-1]
-        logger.info(f"Extracted text from uploaded PDF (size: {len(text)} chars)")
-        chunks = chunk_text(text)
+        logger.info(f"Extracted text from uploaded PDF ({len(pages)} pages, {sum(len(p) for p in pages)} chars)")
+        chunks, duplicates_skipped = chunk_pages(pages)
         n_chunks = len(chunks)
-        logger.info(f"PDF parsed into {n_chunks} chunk(s)")
+        logger.info(f"PDF parsed into {n_chunks} chunk(s), {duplicates_skipped} near-duplicate(s) skipped")
 
         avg_time_per_chunk = 10  # seconds
         time_estimate = n_chunks * avg_time_per_chunk
@@ -72,19 +143,14 @@ def summarize(payload: dict = Body(...)):
             logger.info(f"----- Chunk {idx + 1} Output -----\n{chunk_summary}\n")
             chunk_summaries.append(chunk_summary)
 
-        if n_chunks <= 5:
-            summary = "\n\n".join(chunk_summaries)
-            exec_summary = summarizer.executive_summary(chunk_summaries, user_instruction=user_prompt)
-        else:
-            meta = summarizer.meta_summarize(chunk_summaries, user_instruction=user_prompt)
-            summary = meta
-            exec_summary = summarizer.executive_summary(meta, user_instruction=user_prompt)
+        summary, exec_source = reduce_summaries(summarizer, chunk_summaries, user_prompt)
+        exec_summary, slide_bullets = finish_brief(summarizer, summary, exec_source, user_prompt, with_slide_bullets)
 
         chunks_used = n_chunks
 
     elif user_prompt:
         summary = summarizer.summarize_chunk(user_prompt)
-        exec_summary = summarizer.executive_summary(summary)
+        exec_summary, slide_bullets = finish_brief(summarizer, summary, summary, "", with_slide_bullets)
         chunks_used = 1
         time_estimate = 10
         logger.info(f"Prompt Summary Output: {summary}")
@@ -93,29 +159,102 @@ def summarize(payload: dict = Body(...)):
         logger.error("No file_url or prompt provided")
         return {"error": "Must provide either a file_url or a prompt."}
 
-    # === NEW: Generate embedding for brief ===
-    embedding_text = summary + "\n" + exec_summary
-    embedding = get_embedding(embedding_text)
-    # ===
-
-    # --- Save to Supabase briefs table ---
-    brief_data = {
-        "project_id": project_id,
-        "user_id": user_id,
-        "title": filename or "New Brief",
-        "summary": summary,
-        "executive_summary": exec_summary,
-        "embedding": embedding,
-        "status": "done",
-    }
-
-    result = supabase.table("briefs").insert(brief_data).execute()
-    logger.info(f"Inserted brief into Supabase: {result.data}")
+    supabase_row = save_brief(project_id, user_id, filename or "New Brief", summary, exec_summary, slide_bullets)
 
     return {
         "summary_markdown": summary,
         "executive_summary": exec_summary,
+        "slide_bullets_markdown": slide_bullets,
         "chunks_used": chunks_used,
+        "duplicate_chunks_skipped": duplicates_skipped,
         "time_estimate": time_estimate,
-        "supabase_row": result.data,
-    }
\ No newline at end of file
+        "supabase_row": supabase_row,
+    }
+
+
+def sse(event: str, data) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+@router.post("/summarize/stream/")
+async def summarize_stream(payload: dict = Body(...)):
+    """
+    Streaming variant of /summarize/ (Server-Sent Events). Emits "start", one "chunk" per
+    chunk summary as it completes, "summary", "executive_summary", then "done" with the
+    Supabase row, or "error" if a step fails. If the client disconnects, LLM calls that
+    haven't started are cancelled.
+    """
+    logger.info("=== /api/summarize/stream/ endpoint HIT ===")
+    file_url = payload.get("file_url")
+    user_prompt = payload.get("prompt", "")
+    project_id = payload.get("project_id")
+    user_id = payload.get("user_id")
+    with_slide_bullets = bool(payload.get("generate_slide_bullets", False))
+
+    if not project_id or not user_id:
+        logger.error("Missing user_id or project_id in payload")
+        return {"error": "project_id and user_id are required."}
+    if not file_url and not user_prompt:
+        logger.error("No file_url or prompt provided")
+        return {"error": "Must provide either a file_url or a prompt."}
+
+    async def events():
+        loop = asyncio.get_running_loop()
+        pool = ThreadPoolExecutor(max_workers=SUMMARIZE_STREAM_WORKERS)
+        summarizer = Summarizer()
+        finished = False
+        try:
+            if file_url:
+                resp = await loop.run_in_executor(pool, requests.get, file_url)
+                if resp.status_code != 200:
+                    logger.error(f"Could not fetch PDF from storage: {file_url}")
+                    yield sse("error", {"error": "Could not fetch file from storage."})
+                    return
+                pages = await loop.run_in_executor(pool, extract_pages_from_pdf_bytes, resp.content)
+                chunks, duplicates_skipped = await loop.run_in_executor(pool, chunk_pages, pages)
+                title, instruction = file_url.split("/")[-1], user_prompt
+            else:
+                chunks, duplicates_skipped = [user_prompt], 0
+                title, instruction = "New Brief", ""
+            n_chunks = len(chunks)
+            yield sse("start", {"chunks": n_chunks, "duplicate_chunks_skipped": duplicates_skipped, "time_estimate": n_chunks * 10})
+
+            # Map stage: chunks run concurrently and are streamed in completion order
+            futures = {
+                asyncio.wrap_future(pool.submit(summarizer.summarize_chunk, chunk, user_instruction=instruction)): idx
+                for idx, chunk in enumerate(chunks)
+            }
+            chunk_summaries = [None] * n_chunks
+            remaining = set(futures)
+            while remaining:
+                done, remaining = await asyncio.wait(remaining, return_when=asyncio.FIRST_COMPLETED)
+                for fut in done:
+                    idx = futures[fut]
+                    chunk_summaries[idx] = fut.result()
+                    yield sse("chunk", {"index": idx, "markdown": chunk_summaries[idx]})
+
+            summary, exec_source = await loop.run_in_executor(pool, reduce_summaries, summarizer, chunk_summaries, instruction)
+            yield sse("summary", {"summary_markdown": summary})
+
+            exec_summary, slide_bullets = await loop.run_in_executor(
+                pool, finish_brief, summarizer, summary, exec_source, instruction, with_slide_bullets
+            )
+            yield sse("executive_summary", {"executive_summary": exec_summary})
+            if slide_bullets is not None:
+                yield sse("slide_bullets", {"slide_bullets_markdown": slide_bullets})
+
+            supabase_row = await loop.run_in_executor(
+                pool, save_brief, project_id, user_id, title, summary, exec_summary, slide_bullets
+            )
+            finished = True
+            yield sse("done", {"chunks_used": n_chunks, "supabase_row": supabase_row})
+        except Exception as e:
+            # LLM, embedding or Supabase failure: end the stream with a terminal event, not a truncated body
+            logger.error(f"Summarize stream failed: {e}", exc_info=True)
+            yield sse("error", {"error": str(e)})
+        finally:
+            # On disconnect Starlette cancels this generator; drop every LLM call not yet started
+            pool.shutdown(wait=False, cancel_futures=True)
+            if not finished:
+                logger.info("Summarize stream ended early; cancelled pending LLM work")
+
+    return StreamingResponse(events(), media_type="text/event-stream")
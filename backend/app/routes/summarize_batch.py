@@ -0,0 +1,239 @@
+# app/routes/summarize_batch.py
+
+from fastapi import APIRouter, Body
+from fastapi.responses import StreamingResponse
+from fastapi.concurrency import run_in_threadpool
+from app.services.parser import extract_pages_from_pdf_bytes
+from app.services.scheduler import FairScheduler
+from app.services.answer_cache import answer_cache
+from app.services.project_index import project_index
+from app.services.llm import Summarizer
+from app.routes.summarize import reduce_summaries, finish_brief
+from app.utils.chunker import chunk_pages
+from app.utils.embed import get_embeddings
+from app.config import BATCH_LLM_WORKERS, BATCH_PARSE_WORKERS
+from concurrent.futures import CancelledError, ProcessPoolExecutor, ThreadPoolExecutor
+import os
+import json
+import asyncio
+import multiprocessing
+import uuid
+import logging
+import threading
+import requests
+from supabase import create_client
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s [%(levelname)s] %(message)s",
+)
+logger = logging.getLogger(__name__)
+
+SUPABASE_URL = os.environ.get("SUPABASE_URL")
+SUPABASE_SERVICE_KEY = os.environ.get("SUPABASE_SERVICE_KEY")
+supabase = create_client(SUPABASE_URL, SUPABASE_SERVICE_KEY)
+
+router = APIRouter()
+
+# Shared by every batch request, so total LLM and parser concurrency stays bounded
+_pools_lock = threading.Lock()
+_llm_scheduler = None
+_parse_pool = None
+
+def _pools():
+    global _llm_scheduler, _parse_pool
+    with _pools_lock:
+        if _llm_scheduler is None:
+            _llm_scheduler = FairScheduler(BATCH_LLM_WORKERS)
+            # Forked workers would inherit the open client sockets of the request that
+            # started the pool, which hides client disconnects from uvicorn
+            methods = multiprocessing.get_all_start_methods()
+            context = multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+            _parse_pool = ProcessPoolExecutor(max_workers=BATCH_PARSE_WORKERS, mp_context=context)
+    return _llm_scheduler, _parse_pool
+
+def parse_and_chunk(content: bytes) -> tuple[list[str], int]:
+    # Runs in a parser process: pdfplumber, tiktoken and MinHash are all CPU-bound
+    return chunk_pages(extract_pages_from_pdf_bytes(content))
+
+
+class BatchCancelled(Exception):
+    pass
+
+
+def summarize_document(key, file_url: str, user_prompt: str, with_slide_bullets: bool, cancelled: threading.Event) -> dict:
+    """
+    Download, parse and summarize one PDF, with every LLM call going through the shared
+    scheduler. Once `cancelled` is set, no further work is started for the document.
+    """
+    scheduler, parse_pool = _pools()
+    summarizer = Summarizer()
+
+    def submit(fn, *args, **kwargs):
+        if cancelled.is_set():
+            raise BatchCancelled()
+        future = scheduler.submit(key, fn, *args, **kwargs)
+        if cancelled.is_set():
+            scheduler.cancel(key)  # cancelled between the check and the submit
+        return future
+
+    resp = requests.get(file_url)
+    if resp.status_code != 200:
+        logger.error(f"Could not fetch PDF from storage: {file_url}")
+        return {"file_url": file_url, "error": "Could not fetch file from storage."}
+    if cancelled.is_set():
+        raise BatchCancelled()
+    chunks, duplicates_skipped = parse_pool.submit(parse_and_chunk, resp.content).result()
+    if not chunks:
+        return {"file_url": file_url, "error": "No readable text found in PDF."}
+    logger.info(f"[batch] {file_url} parsed into {len(chunks)} chunk(s), {duplicates_skipped} near-duplicate(s) skipped")
+
+    chunk_futures = [
+        submit(summarizer.summarize_chunk, chunk, user_instruction=user_prompt)
+        for chunk in chunks
+    ]
+    chunk_summaries = [f.result() for f in chunk_futures]
+
+    # Reduce steps finish a document, so they skip the round-robin queue
+    def submit_urgent(fn, *args, **kwargs):
+        return submit(fn, *args, urgent=True, **kwargs)
+
+    summary, exec_source = reduce_summaries(summarizer, chunk_summaries, user_prompt, submit=submit_urgent)
+    exec_summary, slide_bullets = finish_brief(summarizer, summary, exec_source, user_prompt, with_slide_bullets, submit=submit_urgent)
+
+    return {
+        "file_url": file_url,
+        "title": file_url.split("/")[-1],
+        "summary_markdown": summary,
+        "executive_summary": exec_summary,
+        "slide_bullets_markdown": slide_bullets,
+        "chunks_used": len(chunks),
+        "duplicate_chunks_skipped": duplicates_skipped,
+    }
+
+
+def save_batch(batch_id: str, project_id, user_id, done: list[dict]) -> list:
+    """One batched embedding call and one bulk insert for every finished document."""
+    texts = [
+        d["summary_markdown"] + "\n" + d["executive_summary"] + ("\n" + d["slide_bullets_markdown"] if d["slide_bullets_markdown"] else "")
+        for d in done
+    ]
+    embeddings = get_embeddings(texts)
+    brief_rows = []
+    for d, embedding in zip(done, embeddings):
+        row = {
+            "project_id": project_id,
+            "user_id": user_id,
+            "title": d["title"],
+            "summary": d["summary_markdown"],
+            "executive_summary": d["executive_summary"],
+            "embedding": embedding.to_pgvector(),
+            "status": "done",
+        }
+        if d["slide_bullets_markdown"] is not None:
+            row["slide_bullets"] = d["slide_bullets_markdown"]
+        brief_rows.append(row)
+    result = supabase.table("briefs").insert(brief_rows).execute()
+    rows = result.data
+    for row, embedding in zip(rows or [], embeddings):
+        project_index.record_brief(supabase, row["id"], project_id, user_id, embedding)
+    answer_cache.invalidate_project(project_id)
+    logger.info(f"[batch] {batch_id}: inserted {len(brief_rows)} brief(s)")
+    return rows
+
+def save_documents(batch_id: str, project_id, user_id, done: list[dict]) -> tuple[list, list[tuple[dict, str]]]:
+    """
+    Save finished documents with one bulk insert. If that fails, fall back to one insert
+    per document so a single bad row doesn't lose the rest. Returns (rows, [(document, error)]).
+    """
+    try:
+        return save_batch(batch_id, project_id, user_id, done), []
+    except Exception as e:
+        logger.error(f"[batch] {batch_id}: bulk save failed, retrying per document: {e}", exc_info=True)
+    rows, failures = [], []
+    for d in done:
+        try:
+            rows.extend(save_batch(batch_id, project_id, user_id, [d]) or [])
+        except Exception as e:
+            logger.error(f"[batch] {batch_id}: could not save {d['file_url']}: {e}", exc_info=True)
+            failures.append((d, str(e)))
+    return rows, failures
+
+
+@router.post("/summarize_batch/")
+def summarize_batch(payload: dict = Body(...)):
+    """
+    Summarize a list of PDFs for one project. Streams newline-delimited JSON: one
+    "document" event per file as it finishes, then a "done" event after a single
+    batched embedding call and a single bulk insert into briefs. A document whose brief
+    couldn't be saved gets an "error" event before "done".
+    """
+    file_urls = payload.get("file_urls") or []
+    user_prompt = payload.get("prompt", "")
+    project_id = payload.get("project_id")
+    user_id = payload.get("user_id")
+    with_slide_bullets = bool(payload.get("generate_slide_bullets", False))
+
+    if not project_id or not user_id:
+        logger.error("Missing user_id or project_id in payload")
+        return {"error": "project_id and user_id are required."}
+    if not file_urls:
+        return {"error": "file_urls must be a non-empty list."}
+
+    batch_id = uuid.uuid4().hex
+    logger.info(f"=== /api/summarize_batch/ {batch_id}: {len(file_urls)} document(s) ===")
+
+    async def events():
+        loop = asyncio.get_running_loop()
+        finished = asyncio.Queue()
+        cancelled = threading.Event()
+
+        def run(index, file_url):
+            try:
+                result = summarize_document((batch_id, index), file_url, user_prompt, with_slide_bullets, cancelled)
+            except (BatchCancelled, CancelledError):
+                return
+            except Exception as e:
+                logger.error(f"[batch] {file_url} failed: {e}", exc_info=True)
+                result = {"file_url": file_url, "error": str(e)}
+            loop.call_soon_threadsafe(finished.put_nowait, {"event": "document", "index": index, **result})
+
+        # Coordinator threads mostly wait; the real concurrency limits live in the shared pools
+        coordinators = ThreadPoolExecutor(max_workers=min(len(file_urls), 32))
+        for index, file_url in enumerate(file_urls):
+            coordinators.submit(run, index, file_url)
+
+        completed = False
+        try:
+            done = []
+            for _ in file_urls:
+                event = await finished.get()
+                if "error" not in event:
+                    done.append(event)
+                yield json.dumps(event) + "\n"
+            rows, failures = await run_in_threadpool(save_documents, batch_id, project_id, user_id, done) if done else ([], [])
+            completed = True
+            for d, error in failures:
+                yield json.dumps({"event": "error", "index": d["index"], "file_url": d["file_url"], "error": f"Could not save brief: {error}"}) + "\n"
+            yield json.dumps({
+                "event": "done",
+                "documents": len(file_urls),
+                "succeeded": len(done),
+                "saved": len(done) - len(failures),
+                "supabase_rows": rows,
+            }) + "\n"
+        except Exception as e:
+            # End with a terminal event, not a truncated body; `finally` still cancels leftover work
+            logger.error(f"[batch] {batch_id} failed: {e}", exc_info=True)
+            yield json.dumps({"event": "error", "error": str(e)}) + "\n"
+        finally:
+            coordinators.shutdown(wait=False, cancel_futures=not completed)
+            if not completed:
+                # Client went away (Starlette cancels this generator): nothing will be saved,
+                # so stop paying for the rest of the batch
+                cancelled.set()
+                scheduler, _ = _pools()
+                dropped = sum(scheduler.cancel((batch_id, index)) for index in range(len(file_urls)))
+                logger.info(f"[batch] {batch_id}: stream ended early, cancelled {dropped} queued LLM call(s)")
+
+    return StreamingResponse(events(), media_type="application/x-ndjson")
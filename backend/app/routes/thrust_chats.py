@@ -1,8 +1,12 @@
 # app/routes/thrust_chats.py
 
-from fastapi import APIRouter, Query
+from fastapi import APIRouter, Query, Header, Response
+from typing import Optional
 from supabase import create_client
+import hashlib
+import json
 import os
+import re
 
 router = APIRouter()
 
@@ -10,8 +14,84 @@ SUPABASE_URL = os.environ.get("SUPABASE_URL")
 SUPABASE_SERVICE_KEY = os.environ.get("SUPABASE_SERVICE_KEY")
 supabase = create_client(SUPABASE_URL, SUPABASE_SERVICE_KEY)
 
+DEFAULT_PAGE_SIZE = 200
+MAX_PAGE_SIZE = 1000
+_COLUMN_RE = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+
+def _parse_position(value: str):
+    """A cursor is "<created_at>|<id>"; a bare created_at (no id) is also accepted."""
+    created_at, sep, row_id = value.rpartition("|")
+    return (created_at, row_id) if sep else (value, None)
+
+def _fetch_after(selected: str, project_id: str, position, limit: Optional[int]) -> list:
+    """
+    Rows ordered by (created_at, id), strictly after `position`. created_at isn't unique
+    (clients set it), so rows tied on the boundary timestamp are fetched separately by id.
+    With no id in the position, every row at the boundary timestamp is included.
+    """
+    def base():
+        return supabase.table("thrust_chats").select(selected).eq("project_id", project_id)
+
+    def page(query):
+        # postgrest-py's order() adds a separate "order" key per call and PostgREST applies
+        # only one of them, so both sort columns go in a single parameter
+        query.params = query.params.set("order", "created_at.asc,id.asc")
+        if limit is not None:
+            query = query.limit(limit)
+        resp = query.execute()
+        return resp.data if hasattr(resp, "data") else resp.get("data", [])
+
+    if position is None:
+        return page(base())
+    created_at, row_id = position
+    ties = base().eq("created_at", created_at)
+    if row_id is not None:
+        ties = ties.gt("id", row_id)
+    data = page(ties)
+    if limit is None or len(data) < limit:
+        data += page(base().gt("created_at", created_at))
+    return data if limit is None else data[:limit]
+
 @router.get("/thrust_chats/")
-async def get_chats(project_id: str = Query(...)):
-    resp = supabase.table("thrust_chats").select("*").eq("project_id", project_id).order("created_at", desc=False).execute()
-    data = resp.data if hasattr(resp, "data") else resp.get("data", [])
-    return data
+async def get_chats(
+    project_id: str = Query(...),
+    since: Optional[str] = Query(None, description="Only return chats after this point (incremental sync): the last row's created_at|id, or a bare created_at (inclusive)"),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor header from the previous page"),
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE, description=f"Page size, {DEFAULT_PAGE_SIZE} by default when paging"),
+    columns: Optional[str] = Query(None, description="Comma-separated columns to return, e.g. role,content"),
+    if_none_match: Optional[str] = Header(None),
+):
+    """
+    Chats for a project, ordered by (created_at, id). Without since/cursor/limit the whole
+    history is returned, as before; with any of them the result is paged and X-Next-Cursor
+    is set when more rows follow. The body stays a plain list, and an ETag lets pollers
+    get a 304 instead of the same page again.
+    """
+    selected = "*"
+    if columns:
+        cols = [c.strip() for c in columns.split(",") if c.strip()]
+        if not cols or not all(_COLUMN_RE.match(c) for c in cols):
+            return {"error": "Invalid columns."}
+        for required in ("created_at", "id"):
+            if required not in cols:
+                cols.append(required)  # needed to build the next cursor
+        selected = ",".join(cols)
+
+    paged = cursor is not None or since is not None or limit is not None
+    page_size = (limit or DEFAULT_PAGE_SIZE) if paged else None
+    after = cursor or since
+    position = _parse_position(after) if after else None
+    # One extra row tells us whether another page follows
+    data = _fetch_after(selected, project_id, position, page_size + 1 if paged else None)
+
+    headers = {}
+    if paged and len(data) > page_size:
+        data = data[:page_size]
+        headers["X-Next-Cursor"] = f"{data[-1]['created_at']}|{data[-1]['id']}"
+
+    body = json.dumps(data, default=str, separators=(",", ":"))
+    etag = '"' + hashlib.sha1(body.encode("utf-8")).hexdigest() + '"'
+    headers["ETag"] = etag
+    if if_none_match and etag in [t.strip().removeprefix("W/") for t in if_none_match.split(",")]:
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
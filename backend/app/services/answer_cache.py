@@ -0,0 +1,135 @@
+# app/services/answer_cache.py
+import threading
+import time
+import numpy as np
+from app.config import ASK_THRUST_CACHE_THRESHOLD, ASK_THRUST_CACHE_SIZE, ASK_THRUST_CACHE_TTL
+from app.utils.compact_embedding import CompactEmbedding
+
+
+class _ProjectEntries:
+    """Cached answers for one project, with their unit-normalized query embeddings stacked in one matrix."""
+
+    def __init__(self):
+        self.entries: list[dict] = []
+        self.matrix = None
+
+    def rebuild(self):
+        self.matrix = np.stack([e["query"] for e in self.entries]) if self.entries else None
+
+
+class SemanticAnswerCache:
+    """
+    Per-project cache of ask_thrust answers keyed on query embedding similarity.
+
+    A new query reuses a cached answer when its cosine similarity to a cached query
+    passes `threshold`. Entries are dropped when any brief they were built from is edited
+    through the backend; edits and deletes made elsewhere are caught by the `is_current`
+    check passed to lookup().
+    """
+
+    def __init__(self, threshold: float = ASK_THRUST_CACHE_THRESHOLD,
+                 max_entries: int = ASK_THRUST_CACHE_SIZE, ttl: float = ASK_THRUST_CACHE_TTL):
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._projects: dict[str, _ProjectEntries] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.saved_seconds = 0.0
+
+    @staticmethod
+    def _normalize(embedding: CompactEmbedding) -> np.ndarray:
+        vec = embedding.to_numpy()
+        norm = np.linalg.norm(vec)
+        return vec / norm if norm else vec
+
+    def lookup(self, project_id: str, embedding: CompactEmbedding, is_current=None):
+        """
+        Return the cached result dict for the closest matching query, or None.
+        `is_current(brief_versions)` is called (outside the lock) before a hit is served;
+        if it returns False the entry is dropped and the lookup counts as a miss.
+        """
+        query = self._normalize(embedding)
+        now = time.time()
+        with self._lock:
+            project = self._projects.get(str(project_id))
+            if project is not None and self.ttl > 0:
+                fresh = [e for e in project.entries if now - e["stored_at"] < self.ttl]
+                if len(fresh) != len(project.entries):
+                    project.entries = fresh
+                    project.rebuild()
+            if project is None or project.matrix is None:
+                self.misses += 1
+                return None
+            sims = project.matrix @ query
+            best = int(np.argmax(sims))
+            if sims[best] < self.threshold:
+                self.misses += 1
+                return None
+            entry = project.entries[best]
+            similarity = float(sims[best])
+
+        if is_current is not None and not is_current(entry["brief_versions"]):
+            with self._lock:
+                project = self._projects.get(str(project_id))
+                if project is not None and any(e is entry for e in project.entries):
+                    project.entries = [e for e in project.entries if e is not entry]
+                    project.rebuild()
+                self.misses += 1
+            return None
+        with self._lock:
+            self.hits += 1
+            self.saved_seconds += entry["elapsed"]
+        return {**entry["result"], "cache_similarity": similarity}
+
+    def store(self, project_id: str, embedding: CompactEmbedding, brief_versions: dict, result: dict, elapsed: float):
+        """`brief_versions` maps each brief ID the answer used to a fingerprint of its content."""
+        brief_versions = {str(b): v for b, v in brief_versions.items()}
+        entry = {
+            "query": self._normalize(embedding),
+            "brief_ids": set(brief_versions),
+            "brief_versions": brief_versions,
+            "result": result,
+            "elapsed": elapsed,
+            "stored_at": time.time(),
+        }
+        with self._lock:
+            project = self._projects.setdefault(str(project_id), _ProjectEntries())
+            project.entries.append(entry)
+            if len(project.entries) > self.max_entries:
+                project.entries = project.entries[-self.max_entries:]
+            project.rebuild()
+
+    def invalidate_brief(self, brief_id) -> int:
+        """Drop every cached answer that used `brief_id`. Returns how many were removed."""
+        brief_id = str(brief_id)
+        removed = 0
+        with self._lock:
+            for project in self._projects.values():
+                kept = [e for e in project.entries if brief_id not in e["brief_ids"]]
+                if len(kept) != len(project.entries):
+                    removed += len(project.entries) - len(kept)
+                    project.entries = kept
+                    project.rebuild()
+        return removed
+
+    def invalidate_project(self, project_id) -> int:
+        """Drop a project's answers, e.g. when a new brief could change what retrieval returns."""
+        with self._lock:
+            project = self._projects.pop(str(project_id), None)
+        return len(project.entries) if project else 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "saved_seconds": round(self.saved_seconds, 3),
+                "entries": sum(len(p.entries) for p in self._projects.values()),
+            }
+
+
+answer_cache = SemanticAnswerCache()
@@ -1,14 +1,97 @@
 # app/services/llm.py
+import logging
+import re
+import threading
+from collections import defaultdict
 from openai import OpenAI
-from app.config import OPENAI_API_KEY, OPENAI_MODEL_NAME
+from app.config import OPENAI_API_KEY, OPENAI_STAGE_MODELS
 
 client = OpenAI(api_key=OPENAI_API_KEY)
+logger = logging.getLogger(__name__)
+
+
+# --- Output format checks that decide whether a cascade escalates ---
+def _has_section_header(output: str) -> bool:
+    return re.search(r"^## \S", output, re.MULTILINE) is not None
+
+# Same prefixes, case-insensitively, as the chat panel's parser (frontend AIChatPanel.tsx)
+_CHAT_PREFIX_RE = re.compile(r"(Edit, Executive Summary:|Edit, Overall Summary:|Question:)", re.IGNORECASE)
+
+def _has_chat_prefix(output: str) -> bool:
+    return _CHAT_PREFIX_RE.match(output) is not None
+
+STAGE_CHECKS = {
+    "summarize_chunk": _has_section_header,
+    "generate_slide_bullets": _has_section_header,
+    "chat_on_summary": _has_chat_prefix,
+}
+
+
+class RoutingStats:
+    """
+    Thread-safe counters of which model served each stage and how often a cascade escalated.
+    `escalation_rate` is the share of calls that escalated at least once; `escalations`
+    counts every step up the cascade, so it can exceed `calls` with three or more models.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = defaultdict(int)
+        self._escalated_calls = defaultdict(int)
+        self._escalations = defaultdict(int)
+        self._served = defaultdict(lambda: defaultdict(int))
+
+    def record(self, stage: str, model: str, escalations: int):
+        with self._lock:
+            self._calls[stage] += 1
+            self._escalated_calls[stage] += escalations > 0
+            self._escalations[stage] += escalations
+            self._served[stage][model] += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                stage: {
+                    "calls": calls,
+                    "escalated_calls": self._escalated_calls[stage],
+                    "escalations": self._escalations[stage],
+                    "escalation_rate": self._escalated_calls[stage] / calls,
+                    "served_by": dict(self._served[stage]),
+                }
+                for stage, calls in self._calls.items()
+            }
+
+routing_stats = RoutingStats()
+
 
 class Summarizer:
-    def __init__(self, model=OPENAI_MODEL_NAME, max_words_per_bullet=60):
-        self.model = model
+    def __init__(self, model=None, max_words_per_bullet=60, stage_models: dict = None):
+        # An explicit model pins every stage to it; otherwise use the configured per-stage cascades
+        if model:
+            self.stage_models = {stage: [model] for stage in OPENAI_STAGE_MODELS}
+        else:
+            self.stage_models = {**OPENAI_STAGE_MODELS, **(stage_models or {})}
+        self.model = self.stage_models["summarize_chunk"][0]
         self.max_words = max_words_per_bullet
 
+    def _complete(self, stage: str, messages: list) -> str:
+        """
+        Run `messages` through the stage's model cascade. Each output is checked against
+        STAGE_CHECKS[stage]; on failure the next model is tried. The last output is
+        returned even if it fails, matching the old single-model behaviour.
+        """
+        models = self.stage_models.get(stage) or [self.model]
+        check = STAGE_CHECKS.get(stage)
+        for attempt, model in enumerate(models):
+            response = client.chat.completions.create(model=model, messages=messages)
+            output = response.choices[0].message.content.strip()
+            if check is None or check(output) or attempt == len(models) - 1:
+                break
+            logger.info(f"[{stage}] {model} output failed format check, escalating to {models[attempt + 1]}")
+        routing_stats.record(stage, model, attempt)
+        logger.info(f"[{stage}] served by {model} after {attempt} escalation(s)")
+        return output
+
     def summarize_chunk(self, text: str, user_instruction: str = "") -> str:
         user_req = f"The user wants: {user_instruction}" if user_instruction else ""
         prompt = f"""
@@ -32,14 +115,10 @@ Each bullet should be under {self.max_words} words and avoid fluff.
 Here is the section to summarize:
 {text}
 """
-        response = client.chat.completions.create(
-            model=self.model,
-            messages=[
-                {"role": "system", "content": "You are an AI assistant that summarizes financial and business documents for strategy consultants."},
-                {"role": "user", "content": prompt}
-            ]
-        )
-        return response.choices[0].message.content.strip()
+        return self._complete("summarize_chunk", [
+            {"role": "system", "content": "You are an AI assistant that summarizes financial and business documents for strategy consultants."},
+            {"role": "user", "content": prompt}
+        ])
 
     def meta_summarize(self, summaries: list[str], user_instruction: str = "") -> str:
         joined = "\n\n".join(summaries)
@@ -59,14 +138,10 @@ Instructions:
 Summaries to combine:
 {joined}
 """
-        response = client.chat.completions.create(
-            model=self.model,
-            messages=[
-                {"role": "system", "content": "You are an AI assistant for consultants."},
-                {"role": "user", "content": prompt}
-            ]
-        )
-        return response.choices[0].message.content.strip()
+        return self._complete("meta_summarize", [
+            {"role": "system", "content": "You are an AI assistant for consultants."},
+            {"role": "user", "content": prompt}
+        ])
 
     def executive_summary(self, summaries: list[str] | str, user_instruction: str = "") -> str:
         joined = "\n\n".join(summaries) if isinstance(summaries, list) else summaries
@@ -79,14 +154,10 @@ You are an expert strategy consultant. Write an executive summary (2–3 sentenc
 Source material:
 {joined}
 """
-        response = client.chat.completions.create(
-            model=self.model,
-            messages=[
-                {"role": "system", "content": "You are an AI assistant for consultants."},
-                {"role": "user", "content": prompt}
-            ]
-        )
-        return response.choices[0].message.content.strip()
+        return self._complete("executive_summary", [
+            {"role": "system", "content": "You are an AI assistant for consultants."},
+            {"role": "user", "content": prompt}
+        ])
 
     def chat_on_summary(self, summary: str, user_message: str, history: list = None) -> str:
         history_str = ""
@@ -148,14 +219,10 @@ Instructions:
 
 Return only the most helpful, relevant response, and only use outside information if the user specifically requests it.
 """
-        response = client.chat.completions.create(
-            model=self.model,
-            messages=[
-                {"role": "system", "content": "You are an expert AI assistant for consultants, helping edit and improve summaries."},
-                {"role": "user", "content": prompt}
-            ]
-        )
-        return response.choices[0].message.content.strip()
+        return self._complete("chat_on_summary", [
+            {"role": "system", "content": "You are an expert AI assistant for consultants, helping edit and improve summaries."},
+            {"role": "user", "content": prompt}
+        ])
 
     def generate_slide_bullets(self, summary: str, user_instruction: str = "") -> str:
         user_req = f"The user wants: {user_instruction}" if user_instruction else ""
@@ -175,14 +242,10 @@ Instructions:
 Here is the summary:
 {summary}
 """
-        response = client.chat.completions.create(
-            model=self.model,
-            messages=[
-                {"role": "system", "content": "You are an expert consultant creating slide bullets from a business summary."},
-                {"role": "user", "content": prompt}
-            ]
-        )
-        return response.choices[0].message.content.strip()
+        return self._complete("generate_slide_bullets", [
+            {"role": "system", "content": "You are an expert consultant creating slide bullets from a business summary."},
+            {"role": "user", "content": prompt}
+        ])
 
     def chat_on_slide_bullets(self, slide_bullets: str, user_message: str, history: list = None) -> str:
         history_str = ""
@@ -215,14 +278,10 @@ Instructions:
 - Edits must be ready to copy-paste into a presentation.
 - Do not include any preamble, background, or commentary in your output.
 """
-        response = client.chat.completions.create(
-            model=self.model,
-            messages=[
-                {"role": "system", "content": "You are an expert AI assistant for consultants, focused on editing and improving slide bullets for presentations."},
-                {"role": "user", "content": prompt}
-            ]
-        )
-        return response.choices[0].message.content.strip()
+        return self._complete("chat_on_slide_bullets", [
+            {"role": "system", "content": "You are an expert AI assistant for consultants, focused on editing and improving slide bullets for presentations."},
+            {"role": "user", "content": prompt}
+        ])
     
     def ask_thrust(self, context_text: str, user_message: str, history: list = None) -> str:
         prompt = f"""
@@ -248,11 +307,7 @@ Instructions:
         if history:
             for turn in history:
                 messages.insert(-1, {"role": turn['role'], "content": turn['content']})
-        response = client.chat.completions.create(
-            model=self.model,
-            messages=messages
-        )
-        return response.choices[0].message.content.strip()
+        return self._complete("ask_thrust", messages)
 
     def ask_thrust_global(self, context_text: str, user_message: str, history: list = None) -> str:
         # This is literally the same as ask_thrust for now, but we can specialize later if needed.
@@ -1,11 +1,25 @@
 # app/services/parser.py
+import os
+import tempfile
 import pdfplumber
 
-def extract_text_from_pdf(path: str) -> str:
-    full_text = ""
+def extract_pages_from_pdf(path: str) -> list[str]:
+    pages = []
     with pdfplumber.open(path) as pdf:
         for page in pdf.pages:
             text = page.extract_text()
             if text:
-                full_text += text + "\n"
-    return full_text.strip()
+                pages.append(text)
+    return pages
+
+def extract_text_from_pdf(path: str) -> str:
+    return "\n".join(extract_pages_from_pdf(path)).strip()
+
+def extract_pages_from_pdf_bytes(content: bytes) -> list[str]:
+    with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as tmp:
+        tmp.write(content)
+        temp_path = tmp.name
+    try:
+        return extract_pages_from_pdf(temp_path)
+    finally:
+        os.remove(temp_path)
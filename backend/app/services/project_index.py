@@ -0,0 +1,207 @@
+# app/services/project_index.py
+import time
+import threading
+import logging
+import numpy as np
+from app.config import ASK_THRUST_GLOBAL_INDEX_TTL
+from app.utils.compact_embedding import CompactEmbedding
+
+logger = logging.getLogger(__name__)
+
+
+class _UserProjects:
+    """One user's projects: running embedding sums per project, plus each brief's vector so edits can be undone."""
+
+    def __init__(self):
+        self.sums: dict[str, np.ndarray] = {}
+        self.counts: dict[str, int] = {}
+        self.titles: dict[str, str] = {}
+        self.briefs: dict[str, tuple[str, np.ndarray]] = {}
+        self.project_ids: list[str] = []
+        self.matrix = None
+        self.synced_at = 0.0
+        self.syncing = False
+
+    def add(self, brief_id: str, project_id: str, vec: np.ndarray):
+        self.remove(brief_id)
+        if project_id not in self.sums:
+            self.sums[project_id] = np.zeros_like(vec, dtype=np.float64)
+            self.counts[project_id] = 0
+        self.sums[project_id] += vec
+        self.counts[project_id] += 1
+        self.briefs[brief_id] = (project_id, vec)
+        self.matrix = None
+
+    def remove(self, brief_id: str):
+        old = self.briefs.pop(brief_id, None)
+        if old is None:
+            return
+        project_id, vec = old
+        self.sums[project_id] -= vec
+        self.counts[project_id] -= 1
+        if self.counts[project_id] == 0:
+            del self.sums[project_id], self.counts[project_id]
+        self.matrix = None
+
+    def centroids(self):
+        """Unit-normalized centroid per project, rebuilt only after a write."""
+        if self.matrix is None and self.sums:
+            self.project_ids = list(self.sums)
+            matrix = np.stack([self.sums[p] / self.counts[p] for p in self.project_ids]).astype(np.float32)
+            norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+            self.matrix = matrix / np.where(norms == 0, 1, norms)
+        return self.project_ids, self.matrix
+
+
+class ProjectCentroidIndex:
+    """
+    Per-user index of project centroid embeddings for coarse-to-fine global search.
+
+    A user's brief vectors are read from Supabase once, on their first routed query, and
+    kept current by `record_brief` / `update_brief` from the backend write paths. Deletes
+    only happen outside the backend (the frontend deletes briefs directly), and other
+    workers insert briefs too, so every `ttl` seconds the index is re-synced against the
+    brief and project IDs, fetching vectors only for briefs it hasn't seen.
+    """
+
+    _FETCH_BATCH = 200
+    # Must not exceed PostgREST's max-rows (1000 on Supabase by default), or a full page
+    # would look short and end the scan early
+    _PAGE_SIZE = 1000
+
+    def __init__(self, ttl: float = ASK_THRUST_GLOBAL_INDEX_TTL):
+        self.ttl = ttl
+        self._users: dict[str, _UserProjects] = {}
+        self._brief_owner: dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _rows(resp) -> list:
+        return (resp.data if hasattr(resp, "data") else resp.get("data", [])) or []
+
+    def _all_rows(self, query) -> list:
+        """Every row of an id-ordered query, one range() page at a time."""
+        rows, start = [], 0
+        while True:
+            page = self._rows(query().order("id").range(start, start + self._PAGE_SIZE - 1).execute())
+            rows.extend(page)
+            if len(page) < self._PAGE_SIZE:
+                return rows
+            start += self._PAGE_SIZE
+
+    def _fetch_vectors(self, supabase, brief_ids: list[str]) -> dict[str, tuple[str, np.ndarray]]:
+        vectors = {}
+        for i in range(0, len(brief_ids), self._FETCH_BATCH):
+            batch = brief_ids[i:i + self._FETCH_BATCH]
+            rows = self._rows(supabase.table("briefs").select("id,project_id,embedding").in_("id", batch).execute())
+            for b in rows:
+                if b.get("embedding") is not None and b.get("project_id") is not None:
+                    vectors[str(b["id"])] = (str(b["project_id"]), CompactEmbedding.from_supabase(b["embedding"]).to_numpy())
+        return vectors
+
+    def _load(self, supabase, user_id: str) -> _UserProjects:
+        projects = self._all_rows(lambda: supabase.table("projects").select("id,title").eq("user_id", user_id))
+        briefs = self._all_rows(lambda: supabase.table("briefs").select("id,project_id,embedding").eq("user_id", user_id))
+        state = _UserProjects()
+        state.titles = {str(p["id"]): p.get("title") or "" for p in projects}
+        for b in briefs:
+            if b.get("embedding") is not None and b.get("project_id") is not None:
+                vec = CompactEmbedding.from_supabase(b["embedding"]).to_numpy()
+                state.add(str(b["id"]), str(b["project_id"]), vec)
+        state.synced_at = time.monotonic()
+        logger.info(f"Loaded project centroids for user {user_id}: {len(state.sums)} project(s), {len(state.briefs)} brief(s)")
+        return state
+
+    def _sync(self, supabase, user_id: str, state: _UserProjects):
+        """Reconcile with Supabase using IDs only; vectors are fetched just for briefs added elsewhere."""
+        projects = self._all_rows(lambda: supabase.table("projects").select("id,title").eq("user_id", user_id))
+        rows = self._all_rows(lambda: supabase.table("briefs").select("id,project_id").eq("user_id", user_id))
+        current = {str(b["id"]): str(b["project_id"]) for b in rows if b.get("project_id") is not None}
+        with self._lock:
+            known = set(state.briefs)
+        new_vectors = self._fetch_vectors(supabase, [b for b in current if b not in known])
+
+        with self._lock:
+            state.titles = {str(p["id"]): p.get("title") or "" for p in projects}
+            removed = [b for b in state.briefs if b not in current]
+            for brief_id in removed:
+                self._remove_locked(brief_id)
+            for brief_id, (project_id, vec) in list(state.briefs.items()):
+                if current[brief_id] != project_id:
+                    state.add(brief_id, current[brief_id], vec)
+            for brief_id, (project_id, vec) in new_vectors.items():
+                state.add(brief_id, project_id, vec)
+                self._brief_owner[brief_id] = user_id
+            state.synced_at = time.monotonic()
+        logger.info(f"Synced project centroids for user {user_id}: -{len(removed)} +{len(new_vectors)} brief(s)")
+
+    def _state_for(self, supabase, user_id: str) -> _UserProjects:
+        with self._lock:
+            state = self._users.get(user_id)
+            stale = state is not None and not state.syncing and time.monotonic() - state.synced_at > self.ttl
+            if stale:
+                state.syncing = True
+        if state is None:
+            loaded = self._load(supabase, user_id)
+            with self._lock:
+                state = self._users.setdefault(user_id, loaded)
+                for brief_id in state.briefs:
+                    self._brief_owner[brief_id] = user_id
+        elif stale:
+            try:
+                self._sync(supabase, user_id, state)
+            except Exception as e:
+                # Keep serving the current centroids; the next query past the TTL retries
+                logger.error(f"Project centroid sync failed for user {user_id}: {e}", exc_info=True)
+            finally:
+                state.syncing = False
+        return state
+
+    def top_projects(self, supabase, user_id: str, embedding: CompactEmbedding, k: int) -> list[tuple[str, str, float]]:
+        """Return up to k (project_id, project_title, similarity) closest to the query."""
+        state = self._state_for(supabase, str(user_id))
+        query = embedding.to_numpy()
+        with self._lock:
+            project_ids, matrix = state.centroids()
+            if matrix is None:
+                return []
+            sims = matrix @ query
+            order = np.argsort(-sims)[:k]
+            return [(project_ids[i], state.titles.get(project_ids[i], ""), float(sims[i])) for i in order]
+
+    def record_brief(self, supabase, brief_id, project_id, user_id, embedding: CompactEmbedding):
+        """Add or replace a brief's vector. Users whose index isn't loaded yet pick it up on first load."""
+        brief_id, project_id, user_id = str(brief_id), str(project_id), str(user_id)
+        with self._lock:
+            state = self._users.get(user_id)
+            if state is None:
+                return
+            state.add(brief_id, project_id, embedding.to_numpy())
+            self._brief_owner[brief_id] = user_id
+            missing_title = project_id not in state.titles
+        if missing_title:
+            # A project created after the index was loaded
+            rows = self._rows(supabase.table("projects").select("id,title").eq("id", project_id).execute())
+            with self._lock:
+                for p in rows:
+                    state.titles[str(p["id"])] = p.get("title") or ""
+
+    def update_brief(self, brief_id, embedding: CompactEmbedding):
+        """Re-point an already indexed brief at its new embedding; briefs we haven't seen are ignored."""
+        brief_id = str(brief_id)
+        with self._lock:
+            user_id = self._brief_owner.get(brief_id)
+            state = self._users.get(user_id) if user_id else None
+            if state is None or brief_id not in state.briefs:
+                return
+            project_id, _ = state.briefs[brief_id]
+            state.add(brief_id, project_id, embedding.to_numpy())
+
+    def _remove_locked(self, brief_id: str):
+        user_id = self._brief_owner.pop(brief_id, None)
+        state = self._users.get(user_id) if user_id else None
+        if state is not None:
+            state.remove(brief_id)
+
+
+project_index = ProjectCentroidIndex()
@@ -0,0 +1,87 @@
+# app/services/scheduler.py
+import threading
+import logging
+from collections import OrderedDict, deque
+from concurrent.futures import Future
+
+logger = logging.getLogger(__name__)
+
+
+class FairScheduler:
+    """
+    Bounded pool of worker threads shared by many documents.
+
+    Jobs are queued per key (one key per document) and served round-robin across keys,
+    so one long filing can't starve the rest of a batch. Jobs submitted with
+    `urgent=True` (reduce steps that finish a document) jump ahead of the rotation.
+    `cancel(key)` drops a key's queued jobs, urgent ones included.
+    """
+
+    def __init__(self, workers: int):
+        self._cond = threading.Condition()
+        self._queues: "OrderedDict[object, deque]" = OrderedDict()
+        self._urgent = deque()
+        self._closed = False
+        self._threads = [
+            threading.Thread(target=self._run, name=f"fair-scheduler-{i}", daemon=True)
+            for i in range(workers)
+        ]
+        for t in self._threads:
+            t.start()
+
+    def submit(self, key, fn, *args, urgent: bool = False, **kwargs) -> Future:
+        future = Future()
+        job = (future, fn, args, kwargs)
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("Scheduler is shut down")
+            if urgent:
+                self._urgent.append((key, job))
+            else:
+                self._queues.setdefault(key, deque()).append(job)
+            self._cond.notify()
+        return future
+
+    def cancel(self, key) -> int:
+        """Drop queued (not yet running) jobs for `key`. Returns how many were cancelled."""
+        with self._cond:
+            jobs = list(self._queues.pop(key, deque()))
+            jobs += [job for k, job in self._urgent if k == key]
+            self._urgent = deque((k, job) for k, job in self._urgent if k != key)
+        for future, *_ in jobs:
+            future.cancel()
+        return len(jobs)
+
+    def _next_job(self):
+        with self._cond:
+            while not self._urgent and not self._queues and not self._closed:
+                self._cond.wait()
+            if self._urgent:
+                return self._urgent.popleft()[1]
+            if not self._queues:
+                return None
+            key, jobs = self._queues.popitem(last=False)
+            job = jobs.popleft()
+            if jobs:
+                self._queues[key] = jobs  # back of the rotation
+            return job
+
+    def _run(self):
+        while True:
+            job = self._next_job()
+            if job is None:
+                return
+            future, fn, args, kwargs = job
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                future.set_result(fn(*args, **kwargs))
+            except BaseException as e:
+                future.set_exception(e)
+
+    def shutdown(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        for t in self._threads:
+            t.join()
@@ -1,5 +1,6 @@
 import tiktoken
 import logging
+from app.utils.dedup import strip_repeated_lines, dedupe_chunks
 
 # Set up logging for this module
 logging.basicConfig(
@@ -31,3 +32,11 @@ def chunk_text(text: str, max_tokens: int = 2000) -> list[str]:
         logging.warning(f"Skipped {len(chunks) - len(english_chunks)} non-English or metadata chunks.")
     logging.info(f"Total English Chunks: {len(english_chunks)}")
     return english_chunks
+
+def chunk_pages(pages: list[str], max_tokens: int = 2000) -> tuple[list[str], int]:
+    """
+    Chunk a parsed PDF for the map stage: strip running headers/footers, chunk, then drop
+    near-duplicate chunks. Returns (chunks, number of duplicate chunks skipped).
+    """
+    text = "\n".join(strip_repeated_lines(pages)).strip()
+    return dedupe_chunks(chunk_text(text, max_tokens=max_tokens))
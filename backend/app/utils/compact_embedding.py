@@ -0,0 +1,158 @@
+# app/utils/compact_embedding.py
+import base64
+import json
+import struct
+import numpy as np
+
+EMBEDDING_DIM = 1536
+MODES = ("float32", "float16", "int8")
+
+# Binary layout: magic, mode index, dimension, int8 scale, then the raw values
+_MAGIC = b"CE"
+_HEADER = struct.Struct("<2sBIf")
+
+# Decimal places kept when writing a vector as pgvector text; more is just noise for the mode
+_TEXT_DECIMALS = {"float32": 6, "float16": 5, "int8": 4}
+
+
+class CompactEmbedding:
+    """
+    Embedding vector backed by a NumPy array instead of a list of Python floats.
+
+    `mode` picks the stored precision: float32 (lossless for OpenAI output),
+    float16, or int8 with a per-vector symmetric scale.
+    """
+
+    __slots__ = ("values", "mode", "scale", "_text")
+
+    def __init__(self, values: np.ndarray, mode: str = "float32", scale: float = 1.0):
+        if mode not in MODES:
+            raise ValueError(f"Unknown embedding mode: {mode!r}")
+        self.values = values
+        self.mode = mode
+        self.scale = float(scale)
+        self._text = None
+
+    @classmethod
+    def from_floats(cls, floats, mode: str = "float32") -> "CompactEmbedding":
+        arr = np.asarray(floats, dtype=np.float32)
+        if mode == "float32":
+            return cls(arr, mode)
+        if mode == "float16":
+            return cls(arr.astype(np.float16), mode)
+        if mode == "int8":
+            peak = float(np.abs(arr).max()) if arr.size else 0.0
+            scale = peak / 127.0 if peak else 1.0
+            quantized = np.clip(np.rint(arr / scale), -127, 127).astype(np.int8)
+            return cls(quantized, mode, scale)
+        raise ValueError(f"Unknown embedding mode: {mode!r}")
+
+    @classmethod
+    def from_base64(cls, data: str, mode: str = "float32") -> "CompactEmbedding":
+        """Build from OpenAI's base64 `encoding_format` (little-endian float32)."""
+        floats = np.frombuffer(base64.b64decode(data), dtype="<f4")
+        return cls.from_floats(floats, mode)
+
+    @classmethod
+    def from_supabase(cls, value, mode: str = "float32") -> "CompactEmbedding":
+        """Accept whatever Supabase hands back for a vector column: pgvector text, a list, or our bytes."""
+        if isinstance(value, CompactEmbedding):
+            return value
+        if isinstance(value, (bytes, bytearray, memoryview)):
+            return cls.from_bytes(bytes(value))
+        if isinstance(value, str):
+            body = value.strip().strip("[]")
+            floats = np.array(body.split(","), dtype=np.float32) if body else np.zeros(0, dtype=np.float32)
+            return cls.from_floats(floats, mode)
+        return cls.from_floats(value, mode)
+
+    def to_numpy(self) -> np.ndarray:
+        """Dequantized float32 view, suitable for dot products."""
+        if self.mode == "int8":
+            return self.values.astype(np.float32) * np.float32(self.scale)
+        return self.values.astype(np.float32, copy=False)
+
+    def to_list(self) -> list[float]:
+        return self.to_numpy().tolist()
+
+    def to_pgvector(self) -> str:
+        """
+        pgvector text literal ("[0.1,0.2,...]") for Supabase inserts, updates and RPC args.
+        Precision is trimmed to what the mode actually carries, which keeps the payload small.
+        """
+        if self._text is None:
+            # Round in float64 so the shortest repr of each value stays short
+            rounded = np.round(self.to_numpy().astype(np.float64), _TEXT_DECIMALS[self.mode])
+            self._text = json.dumps(rounded.tolist(), separators=(",", ":"))
+        return self._text
+
+    def to_bytes(self) -> bytes:
+        header = _HEADER.pack(_MAGIC, MODES.index(self.mode), self.values.size, self.scale)
+        return header + self.values.astype(self.values.dtype.newbyteorder("<"), copy=False).tobytes()
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "CompactEmbedding":
+        magic, mode_idx, dim, scale = _HEADER.unpack_from(data)
+        if magic != _MAGIC:
+            raise ValueError("Not a compact embedding payload")
+        mode = MODES[mode_idx]
+        dtype = {"float32": "<f4", "float16": "<f2", "int8": "i1"}[mode]
+        values = np.frombuffer(data, dtype=dtype, count=dim, offset=_HEADER.size)
+        return cls(values, mode, scale)
+
+    def to_b64(self) -> str:
+        return base64.b64encode(self.to_bytes()).decode("ascii")
+
+    @classmethod
+    def from_b64(cls, data: str) -> "CompactEmbedding":
+        return cls.from_bytes(base64.b64decode(data))
+
+    @property
+    def nbytes(self) -> int:
+        return self.values.nbytes
+
+    def cosine(self, other: "CompactEmbedding") -> float:
+        a, b = self.to_numpy(), other.to_numpy()
+        denom = float(np.linalg.norm(a) * np.linalg.norm(b))
+        return float(a @ b) / denom if denom else 0.0
+
+    def __len__(self) -> int:
+        return int(self.values.size)
+
+    def __repr__(self) -> str:
+        return f"CompactEmbedding(dim={len(self)}, mode={self.mode!r})"
+
+
+def quantization_recall(corpus: np.ndarray, queries: np.ndarray, mode: str, k: int = 10) -> float:
+    """
+    Recall@k of nearest-neighbour search over `mode`-quantized corpus vectors,
+    measured against exact float32 search. Queries stay float32, as ask_thrust and
+    ask_thrust_global request them.
+    """
+    exact = np.argsort(-(queries @ corpus.T), axis=1)[:, :k]
+    quantized = np.stack([CompactEmbedding.from_floats(v, mode).to_numpy() for v in corpus])
+    approx = np.argsort(-(queries @ quantized.T), axis=1)[:, :k]
+    hits = sum(len(set(e) & set(a)) for e, a in zip(exact, approx))
+    return hits / (k * len(queries))
+
+
+if __name__ == "__main__":
+    # python -m app.utils.compact_embedding
+    # Synthetic check: clustered unit vectors, roughly the shape of a brief corpus.
+    rng = np.random.default_rng(0)
+    centers = rng.normal(size=(50, EMBEDDING_DIM))
+    corpus = np.repeat(centers, 40, axis=0) + rng.normal(scale=0.8, size=(2000, EMBEDDING_DIM))
+    corpus /= np.linalg.norm(corpus, axis=1, keepdims=True)
+    queries = corpus[rng.choice(len(corpus), 100, replace=False)] + rng.normal(scale=0.02, size=(100, EMBEDDING_DIM))
+    queries /= np.linalg.norm(queries, axis=1, keepdims=True)
+    corpus = corpus.astype(np.float32)
+    queries = queries.astype(np.float32)
+
+    sample = corpus[0].tolist()
+    print(f"JSON list payload: {len(json.dumps(sample))} bytes")
+    for mode in MODES:
+        emb = CompactEmbedding.from_floats(sample, mode)
+        print(
+            f"{mode:>8}: recall@10={quantization_recall(corpus, queries, mode):.4f} "
+            f"pgvector={len(emb.to_pgvector())}B binary={len(emb.to_bytes())}B"
+        )
@@ -0,0 +1,104 @@
+# app/utils/dedup.py
+import re
+import zlib
+import logging
+from collections import Counter
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Largest prime below 2**32, so a * x + b never overflows uint64 for 32-bit shingle hashes
+_PRIME = 4294967291
+_NUM_PERM = 64
+_perm_rng = np.random.default_rng(1)
+_PERM_A = _perm_rng.integers(1, _PRIME, size=_NUM_PERM, dtype=np.uint64)
+_PERM_B = _perm_rng.integers(0, _PRIME, size=_NUM_PERM, dtype=np.uint64)
+
+
+def _normalize_line(line: str) -> str:
+    # Page numbers and dates change from page to page; the rest of a running header doesn't
+    return re.sub(r"\s+", " ", re.sub(r"\d+", "#", line.strip().lower()))
+
+_PAGE_NUMBER_RE = re.compile(r"^\W*(page\s*)?\d+(\s*(of|/)\s*\d+)?\W*$", re.IGNORECASE)
+_DATE_RE = re.compile(r"\b(jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)[a-z]*\.?\s+\d{1,2},?\s+\d{4}\b", re.IGNORECASE)
+
+def _is_figures(line: str) -> bool:
+    """
+    At least half numbers, like a table row ("2024 2023 2022", "Revenue $391 $383").
+    With digits normalized away these recur from page to page, so they are never treated
+    as running headers. Bare page numbers are the exception.
+    """
+    line = line.strip()
+    if _PAGE_NUMBER_RE.match(line):
+        return False
+    # A date in a running footer ("Rev. February 19, 2019 2") is text, not figures
+    tokens = [t for t in _DATE_RE.sub("date", line).split() if any(c.isalnum() for c in t)]
+    numbers = [t for t in tokens if any(c.isdigit() for c in t) and not any(c.isalpha() for c in t)]
+    return len(numbers) >= 2 and len(numbers) >= 0.5 * len(tokens)
+
+def _edge_keys(lines: list[str], edge_lines: int) -> list[tuple[int, set]]:
+    """(line index, {(offset, normalized line)}) for each edge line: offset from the top, or negative from the bottom."""
+    keyed = []
+    n = len(lines)
+    for i, line in enumerate(lines):
+        offsets = ([i] if i < edge_lines else []) + ([i - n] if i >= n - edge_lines else [])
+        if offsets and not _is_figures(line):
+            norm = _normalize_line(line)
+            keyed.append((i, {(o, norm) for o in offsets}))
+    return keyed
+
+def strip_repeated_lines(pages: list[str], edge_lines: int = 3, min_share: float = 0.25) -> list[str]:
+    """
+    Remove running headers and footers: lines within `edge_lines` of the top or bottom
+    of a page that recur (digits ignored) at the same offset from that edge on at least
+    `min_share` of pages. Lines that are mostly figures are left alone.
+    """
+    if len(pages) < 3:
+        return pages
+    split = [[l for l in page.splitlines() if l.strip()] for page in pages]
+    keyed = [_edge_keys(lines, edge_lines) for lines in split]
+    counts = Counter()
+    for page_keys in keyed:
+        counts.update(set().union(*(keys for _, keys in page_keys)))
+    threshold = max(3, min_share * len(pages))
+    repeated = {key for key, n in counts.items() if n >= threshold}
+    if not repeated:
+        return pages
+
+    stripped, removed = [], 0
+    for lines, page_keys in zip(split, keyed):
+        drop = {i for i, keys in page_keys if keys & repeated}
+        removed += len(drop)
+        stripped.append("\n".join(l for i, l in enumerate(lines) if i not in drop))
+    logger.info(f"Stripped {removed} repeated header/footer line(s) across {len(pages)} page(s)")
+    return stripped
+
+
+def minhash(text: str, shingle_words: int = 5) -> np.ndarray:
+    """MinHash signature over word shingles."""
+    words = re.findall(r"\w+", text.lower())
+    if len(words) < shingle_words:
+        shingles = {" ".join(words)}
+    else:
+        shingles = {" ".join(words[i:i + shingle_words]) for i in range(len(words) - shingle_words + 1)}
+    hashes = np.array([zlib.crc32(s.encode("utf-8")) for s in shingles], dtype=np.uint64)
+    # (a * x + b) mod p for every permutation and shingle, then the min per permutation
+    return ((np.outer(_PERM_A, hashes) + _PERM_B[:, None]) % _PRIME).min(axis=1)
+
+
+def dedupe_chunks(chunks: list[str], threshold: float = 0.8) -> tuple[list[str], int]:
+    """
+    Drop chunks whose estimated Jaccard similarity to an earlier kept chunk is at least
+    `threshold`. Returns (kept chunks in order, number skipped).
+    """
+    kept, signatures = [], []
+    for chunk in chunks:
+        sig = minhash(chunk)
+        if signatures and (np.stack(signatures) == sig).mean(axis=1).max() >= threshold:
+            continue
+        kept.append(chunk)
+        signatures.append(sig)
+    skipped = len(chunks) - len(kept)
+    if skipped:
+        logger.info(f"Skipped {skipped} near-duplicate chunk(s), saving {skipped} LLM call(s)")
+    return kept, skipped
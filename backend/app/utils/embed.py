@@ -1,10 +1,47 @@
+import hashlib
+import threading
+from collections import OrderedDict
 from openai import OpenAI
-from app.config import OPENAI_API_KEY
+from app.config import OPENAI_API_KEY, EMBEDDING_QUANTIZATION, EMBEDDING_CACHE_SIZE
+from app.utils.compact_embedding import CompactEmbedding
 
 EMBEDDING_MODEL = "text-embedding-3-small"
 client = OpenAI(api_key=OPENAI_API_KEY)
 
-def get_embedding(text: str, model=EMBEDDING_MODEL):
+# Local LRU of recent embeddings, stored in the compact binary encoding
+_cache: "OrderedDict[str, bytes]" = OrderedDict()
+_cache_lock = threading.Lock()
+
+def _cache_key(text: str, model: str, mode: str) -> str:
+    return hashlib.sha1(f"{model}\x00{mode}\x00{text}".encode("utf-8")).hexdigest()
+
+def get_embedding(text: str, model=EMBEDDING_MODEL, mode: str = EMBEDDING_QUANTIZATION) -> CompactEmbedding:
+    return get_embeddings([text], model=model, mode=mode)[0]
+
+def get_embeddings(texts: list[str], model=EMBEDDING_MODEL, mode: str = EMBEDDING_QUANTIZATION) -> list[CompactEmbedding]:
+    """Embed several texts with one OpenAI request, skipping any already in the local cache."""
     # Use only the first 8191 tokens if needed (OpenAI max for Ada v2)
-    resp = client.embeddings.create(input=text[:8191], model=model)
-    return resp.data[0].embedding
\ No newline at end of file
+    texts = [text[:8191] for text in texts]
+    keys = [_cache_key(text, model, mode) for text in texts]
+    results: list = [None] * len(texts)
+    with _cache_lock:
+        for i, key in enumerate(keys):
+            cached = _cache.get(key)
+            if cached is not None:
+                _cache.move_to_end(key)
+                results[i] = CompactEmbedding.from_bytes(cached)
+
+    missing = [i for i, r in enumerate(results) if r is None]
+    if missing:
+        # base64 skips the JSON float array on the way back from OpenAI
+        resp = client.embeddings.create(input=[texts[i] for i in missing], model=model, encoding_format="base64")
+        for i, item in zip(missing, sorted(resp.data, key=lambda d: d.index)):
+            results[i] = CompactEmbedding.from_base64(item.embedding, mode)
+
+        if EMBEDDING_CACHE_SIZE > 0:
+            with _cache_lock:
+                for i in missing:
+                    _cache[keys[i]] = results[i].to_bytes()
+                while len(_cache) > EMBEDDING_CACHE_SIZE:
+                    _cache.popitem(last=False)
+    return results
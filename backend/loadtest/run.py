@@ -0,0 +1,205 @@
+# loadtest/run.py
+"""
+Concurrent load test for the FastAPI app.
+
+Starts the app in-process under uvicorn with the OpenAI and Supabase clients replaced by
+local stand-ins (see stubs.py), replays a mixed workload at a target request rate, and
+reports latency percentiles, throughput and error rate per endpoint, plus event-loop lag.
+
+    cd backend
+    python -m loadtest.run --rps 20 --duration 30 --llm-latency 1.5
+"""
+import argparse
+import asyncio
+import os
+import random
+import threading
+import time
+from collections import defaultdict
+import numpy as np
+
+DEFAULT_MIX = "summarize=1,chat=2,ask_thrust=3,ask_thrust_global=1,list_briefs=2,thrust_chats=4"
+
+QUESTIONS = [
+    "What were the main risks called out this year?",
+    "Summarize revenue growth by segment.",
+    "How did operating margin change?",
+    "What guidance did management give?",
+    "Which regions drove the most growth?",
+]
+
+
+def install_stubs(args):
+    """Swap in the stand-ins before any app module creates its real clients."""
+    os.environ.setdefault("OPENAI_API_KEY", "loadtest")
+    os.environ.setdefault("SUPABASE_URL", "http://localhost")
+    os.environ.setdefault("SUPABASE_SERVICE_KEY", "loadtest")
+
+    import openai
+    import supabase
+    from loadtest.stubs import FakeOpenAI, FakeSupabase
+
+    fake_openai = FakeOpenAI(llm_latency=args.llm_latency, embed_latency=args.embed_latency)
+    fake_supabase = FakeSupabase(latency=args.db_latency)
+    fake_supabase.seed(args.projects, args.briefs_per_project, args.chats_per_project)
+    openai.OpenAI = lambda *a, **kw: fake_openai
+    supabase.create_client = lambda *a, **kw: fake_supabase
+    return fake_supabase
+
+
+def build_requests(args):
+    """Each endpoint maps to a function returning (method, url, kwargs) for one request."""
+    def project():
+        return f"project-{random.randrange(args.projects)}"
+
+    return {
+        "summarize": lambda: ("POST", "/api/summarize/", {"json": {
+            "prompt": "Summarize the attached notes on FY24 performance.",
+            "project_id": project(),
+            "user_id": "loadtest-user",
+        }}),
+        "chat": lambda: ("POST", "/api/chat/", {"json": {
+            "message": random.choice(QUESTIONS),
+            "summary": "## Overview\n\n- Revenue grew 8%",
+            "history": [],
+        }}),
+        "ask_thrust": lambda: ("POST", "/api/ask_thrust/", {"json": {
+            "project_id": project(),
+            "message": f"{random.choice(QUESTIONS)} ({random.randrange(args.distinct_questions)})",
+        }}),
+        "ask_thrust_global": lambda: ("POST", "/api/ask_thrust_global/", {"json": {
+            "user_id": "loadtest-user",
+            "message": random.choice(QUESTIONS),
+            "routed": args.routed_global,
+        }}),
+        "list_briefs": lambda: ("GET", "/api/briefs/", {}),
+        "thrust_chats": lambda: ("GET", "/api/thrust_chats/", {"params": {"project_id": project()}}),
+    }
+
+
+def parse_mix(spec: str) -> dict:
+    mix = {}
+    for part in spec.split(","):
+        name, _, weight = part.partition("=")
+        mix[name.strip()] = float(weight or 1)
+    return mix
+
+
+def start_server(app, port: int):
+    import uvicorn
+
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.05)
+    return server, thread
+
+
+def add_loop_probe(app, lags: list, interval: float = 0.01):
+    """Measures how late the server's event loop wakes up; anything large means a route is blocking it."""
+    async def probe():
+        while True:
+            start = time.perf_counter()
+            await asyncio.sleep(interval)
+            lags.append(time.perf_counter() - start - interval)
+
+    async def start_probe():
+        asyncio.get_running_loop().create_task(probe())
+
+    app.router.on_startup.append(start_probe)
+
+
+async def drive(args, base_url: str, requests_by_name: dict, mix: dict):
+    import httpx
+
+    names = list(mix)
+    weights = [mix[n] for n in names]
+    latencies = defaultdict(list)
+    errors = defaultdict(int)
+    counts = defaultdict(int)
+
+    async def one(client, name):
+        method, url, kwargs = requests_by_name[name]()
+        start = time.perf_counter()
+        try:
+            resp = await client.request(method, url, **kwargs)
+            # Routes report failures as {"error": ...} with a 200, so count those too
+            body = resp.json() if resp.headers.get("content-type", "").startswith("application/json") else None
+            ok = resp.status_code < 400 and not (isinstance(body, dict) and "error" in body)
+        except Exception:
+            ok = False
+        latencies[name].append(time.perf_counter() - start)
+        counts[name] += 1
+        if not ok:
+            errors[name] += 1
+
+    limits = httpx.Limits(max_connections=None, max_keepalive_connections=None)
+    async with httpx.AsyncClient(base_url=base_url, timeout=args.timeout, limits=limits) as client:
+        tasks = []
+        start = time.perf_counter()
+        next_at = start
+        while next_at - start < args.duration:
+            # Open-loop Poisson arrivals: a slow server doesn't slow the offered load
+            await asyncio.sleep(max(0.0, next_at - time.perf_counter()))
+            tasks.append(asyncio.create_task(one(client, random.choices(names, weights)[0])))
+            next_at += random.expovariate(args.rps)
+        await asyncio.gather(*tasks)
+        elapsed = time.perf_counter() - start
+    return latencies, errors, counts, elapsed
+
+
+def report(latencies, errors, counts, elapsed, lags):
+    header = f"{'endpoint':<18}{'count':>7}{'err%':>7}{'rps':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}"
+    print(header)
+    print("-" * len(header))
+    for name in sorted(counts):
+        ms = np.array(latencies[name]) * 1000
+        p50, p95, p99 = np.percentile(ms, [50, 95, 99])
+        err = 100.0 * errors[name] / counts[name]
+        print(f"{name:<18}{counts[name]:>7}{err:>7.1f}{counts[name] / elapsed:>8.2f}{p50:>10.0f}{p95:>10.0f}{p99:>10.0f}")
+    total = sum(counts.values())
+    print(f"\ntotal: {total} requests in {elapsed:.1f}s ({total / elapsed:.2f} rps), {sum(errors.values())} errors")
+    if lags:
+        lag_ms = np.array(lags) * 1000
+        print(f"event-loop lag: p50 {np.percentile(lag_ms, 50):.1f} ms, p99 {np.percentile(lag_ms, 99):.1f} ms, max {lag_ms.max():.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rps", type=float, default=10.0, help="target request rate")
+    parser.add_argument("--duration", type=float, default=20.0, help="seconds of load")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="endpoint weights, e.g. 'chat=2,ask_thrust=3'")
+    parser.add_argument("--llm-latency", type=float, default=1.0, help="seconds per stub chat completion")
+    parser.add_argument("--embed-latency", type=float, default=0.1, help="seconds per stub embedding request")
+    parser.add_argument("--db-latency", type=float, default=0.02, help="seconds per stub Supabase call")
+    parser.add_argument("--projects", type=int, default=5)
+    parser.add_argument("--briefs-per-project", type=int, default=20)
+    parser.add_argument("--chats-per-project", type=int, default=200)
+    parser.add_argument("--distinct-questions", type=int, default=50, help="spread of ask_thrust questions")
+    parser.add_argument("--routed-global", action="store_true", help="use project-routed ask_thrust_global retrieval")
+    parser.add_argument("--timeout", type=float, default=120.0)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    random.seed(args.seed)
+
+    install_stubs(args)
+    from app.main import app
+    import logging
+    logging.getLogger().setLevel(logging.WARNING)
+
+    lags = []
+    add_loop_probe(app, lags)
+    server, thread = start_server(app, args.port)
+    try:
+        mix = parse_mix(args.mix)
+        results = asyncio.run(drive(args, f"http://127.0.0.1:{args.port}", build_requests(args), mix))
+    finally:
+        server.should_exit = True
+        thread.join()
+    report(*results, lags)
+
+
+if __name__ == "__main__":
+    main()
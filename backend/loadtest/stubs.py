@@ -0,0 +1,246 @@
+# loadtest/stubs.py
+# Local stand-ins for the OpenAI and Supabase clients, with configurable latency.
+# Both block the calling thread for their latency, just like the real sync SDKs do.
+import base64
+import threading
+import time
+import zlib
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+import httpx
+import numpy as np
+from app.utils.compact_embedding import CompactEmbedding, EMBEDDING_DIM
+
+
+def _vector_for(text: str) -> np.ndarray:
+    # Deterministic per text, so repeated questions embed identically
+    rng = np.random.default_rng(zlib.crc32(text.encode("utf-8")))
+    vec = rng.normal(size=EMBEDDING_DIM).astype("<f4")
+    return vec / np.linalg.norm(vec)
+
+
+class FakeOpenAI:
+    """Covers the two calls the app makes: chat.completions.create and embeddings.create."""
+
+    def __init__(self, llm_latency: float = 1.0, embed_latency: float = 0.1):
+        self.llm_latency = llm_latency
+        self.embed_latency = embed_latency
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._chat))
+        self.embeddings = SimpleNamespace(create=self._embed)
+
+    def _chat(self, model, messages, **kwargs):
+        time.sleep(self.llm_latency)
+        content = "## Stub Section\n\n- Stub insight one\n- Stub insight two"
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+    def _embed(self, input, model, encoding_format="float", **kwargs):
+        time.sleep(self.embed_latency)
+        texts = input if isinstance(input, list) else [input]
+        data = []
+        for i, text in enumerate(texts):
+            vec = _vector_for(text)
+            embedding = base64.b64encode(vec.tobytes()).decode("ascii") if encoding_format == "base64" else vec.tolist()
+            data.append(SimpleNamespace(index=i, embedding=embedding))
+        return SimpleNamespace(data=data)
+
+
+def _like(current, value):
+    # Filter values arrive as strings (as they would in a PostgREST URL); compare as the column's type
+    return type(current)(value) if isinstance(current, (int, float)) and isinstance(value, str) else value
+
+
+class _Query:
+    def __init__(self, db: "FakeSupabase", table: str):
+        self.db = db
+        self.table = table
+        self.op = "select"
+        self.columns = None
+        self.payload = None
+        self.filters = []
+        self.params = httpx.QueryParams()
+        self.row_limit = None
+        self.row_offset = 0
+        self.single_row = False
+
+    def select(self, columns: str = "*"):
+        self.op = "select"
+        self.columns = None if columns.strip() == "*" else [c.strip() for c in columns.split(",")]
+        return self
+
+    def insert(self, payload):
+        self.op, self.payload = "insert", payload
+        return self
+
+    def update(self, payload):
+        self.op, self.payload = "update", payload
+        return self
+
+    def delete(self):
+        self.op = "delete"
+        return self
+
+    def _filter(self, column, test):
+        self.filters.append(lambda row: column in row and test(row[column]))
+        return self
+
+    def eq(self, column, value):
+        return self._filter(column, lambda v: str(v) == str(value))
+
+    def neq(self, column, value):
+        return self._filter(column, lambda v: str(v) != str(value))
+
+    def gt(self, column, value):
+        return self._filter(column, lambda v: v > _like(v, value))
+
+    def gte(self, column, value):
+        return self._filter(column, lambda v: v >= _like(v, value))
+
+    def lt(self, column, value):
+        return self._filter(column, lambda v: v < _like(v, value))
+
+    def lte(self, column, value):
+        return self._filter(column, lambda v: v <= _like(v, value))
+
+    def in_(self, column, values):
+        values = {str(v) for v in values}
+        return self._filter(column, lambda v: str(v) in values)
+
+    def order(self, column, desc: bool = False):
+        # Same as postgrest-py: one more "order" key per call
+        self.params = self.params.add("order", f"{column}{'.desc' if desc else ''}")
+        return self
+
+    def _order_by(self) -> list[tuple[str, bool]]:
+        # PostgREST applies a single "order" parameter, which may list several columns
+        orders = self.params.get_list("order")
+        if not orders:
+            return []
+        keys = []
+        for part in orders[0].split(","):
+            column, *mods = part.strip().split(".")
+            keys.append((column, "desc" in mods))
+        return keys
+
+    def limit(self, n: int):
+        self.row_limit = n
+        return self
+
+    def range(self, start: int, end: int):
+        self.row_offset, self.row_limit = start, end - start + 1
+        return self
+
+    def single(self):
+        self.single_row = True
+        return self
+
+    def execute(self):
+        time.sleep(self.db.latency)
+        with self.db.lock:
+            rows = self.db.tables.setdefault(self.table, [])
+            if self.op == "insert":
+                payload = self.payload if isinstance(self.payload, list) else [self.payload]
+                inserted = [self.db._new_row(self.table, p) for p in payload]
+                rows.extend(inserted)
+                return SimpleNamespace(data=[dict(r) for r in inserted])
+            matched = [r for r in rows if all(f(r) for f in self.filters)]
+            if self.op == "delete":
+                rows[:] = [r for r in rows if r not in matched]
+                return SimpleNamespace(data=[dict(r) for r in matched])
+            if self.op == "update":
+                for r in matched:
+                    r.update(self.payload)
+                    self.db._touch(self.table, r)
+                return SimpleNamespace(data=[dict(r) for r in matched])
+            # Stable sorts, last key first, give the same result as ORDER BY a, b
+            for column, desc in reversed(self._order_by()):
+                matched.sort(key=lambda r: (r.get(column) is not None, r.get(column)), reverse=desc)
+            # PostgREST caps every response at max-rows, whatever limit() asked for
+            caps = [n for n in (self.row_limit, self.db.max_rows) if n is not None]
+            matched = matched[self.row_offset:]
+            if caps:
+                matched = matched[:min(caps)]
+            out = [{c: r.get(c) for c in self.columns} if self.columns else dict(r) for r in matched]
+        if self.single_row:
+            return SimpleNamespace(data=out[0] if out else None)
+        return SimpleNamespace(data=out)
+
+
+class FakeSupabase:
+    """
+    In-memory Supabase client: table() query builders and the vector-search RPCs,
+    backed by plain lists of dicts. Every execute() sleeps for `latency` first.
+    """
+
+    def __init__(self, latency: float = 0.02, max_rows: int = 1000):
+        self.latency = latency
+        self.max_rows = max_rows
+        self.lock = threading.Lock()
+        self.tables: dict[str, list[dict]] = {}
+        self._vectors: dict[str, np.ndarray] = {}
+        self._next_id = 1
+        self._clock = datetime(2024, 1, 1)
+
+    def table(self, name: str) -> _Query:
+        return _Query(self, name)
+
+    def _new_row(self, table: str, payload: dict) -> dict:
+        self._clock += timedelta(seconds=1)
+        row = {"id": self._next_id, "created_at": self._clock.isoformat(), **payload}
+        self._next_id += 1
+        self._touch(table, row)
+        return row
+
+    def _touch(self, table: str, row: dict):
+        if table == "briefs" and row.get("embedding") is not None:
+            self._vectors[str(row["id"])] = CompactEmbedding.from_supabase(row["embedding"]).to_numpy()
+
+    def rpc(self, name: str, args: dict):
+        outer = self
+
+        class _Rpc:
+            def execute(self_inner):
+                time.sleep(outer.latency)
+                return SimpleNamespace(data=outer._match(name, args))
+        return _Rpc()
+
+    def _match(self, name: str, args: dict) -> list[dict]:
+        query = CompactEmbedding.from_supabase(args["query_embedding"]).to_numpy()
+        with self.lock:
+            briefs = self.tables.get("briefs", [])
+            if name == "match_briefs_by_embedding":
+                candidates = [b for b in briefs if str(b.get("project_id")) == str(args["project_id"])]
+            elif name == "match_briefs_by_user_embedding":
+                candidates = [b for b in briefs if str(b.get("user_id")) == str(args["target_user_id"])]
+            else:
+                raise ValueError(f"Unknown RPC: {name}")
+            candidates = [b for b in candidates if str(b["id"]) in self._vectors]
+            if not candidates:
+                return []
+            matrix = np.stack([self._vectors[str(b["id"])] for b in candidates])
+            order = np.argsort(-(matrix @ query))[: args.get("top_n", 5)]
+            return [{k: v for k, v in candidates[i].items() if k != "embedding"} for i in order]
+
+    def seed(self, projects: int, briefs_per_project: int, chats_per_project: int, user_id: str = "loadtest-user"):
+        for p in range(projects):
+            project_id = f"project-{p}"
+            self._new_row_into("projects", {"id": project_id, "user_id": user_id, "title": f"Project {p}"})
+            for b in range(briefs_per_project):
+                text = f"Brief {b} of {project_id}"
+                self._new_row_into("briefs", {
+                    "project_id": project_id,
+                    "user_id": user_id,
+                    "title": text,
+                    "summary": f"## {text}\n\n- Seeded insight",
+                    "executive_summary": f"Seeded executive summary for {text}.",
+                    "embedding": CompactEmbedding.from_floats(_vector_for(text)).to_pgvector(),
+                    "status": "done",
+                })
+            for c in range(chats_per_project):
+                self._new_row_into("thrust_chats", {
+                    "project_id": project_id,
+                    "role": "user" if c % 2 == 0 else "assistant",
+                    "content": f"Seeded message {c}",
+                })
+
+    def _new_row_into(self, table: str, payload: dict):
+        self.tables.setdefault(table, []).append(self._new_row(table, payload))